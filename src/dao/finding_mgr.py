@@ -1,7 +1,7 @@
 import sqlalchemy
 from sqlalchemy.orm import sessionmaker
 
-from dao.entity import Project_Finding
+from dao.entity import Project_Finding, Project_Task
 
 
 class ProjectFindingMgr(object):
@@ -42,6 +42,29 @@ class ProjectFindingMgr(object):
         except sqlalchemy.exc.IntegrityError:
             session.rollback()
 
+    def replace_findings_by_task_id(self, task_id: int, findings, task_short_result=None):
+        """
+        幂等写入（方案 A）：同一事务内删除该 task 的旧 findings，并批量插入本次 findings。
+        传入 task_short_result 时，同一事务内一并更新 project_task.short_result（如 split_done）。
+        """
+        return self._operate_in_session(self._replace_findings_by_task_id, task_id, findings, task_short_result)
+
+    def _replace_findings_by_task_id(self, session, task_id: int, findings, task_short_result=None):
+        try:
+            session.query(Project_Finding).filter_by(project_id=self.project_id, task_id=task_id).delete()
+            # id 由数据库自增生成；用 Core insert 一次 executemany 写入，无需 ORM 逐条回填主键
+            rows = [
+                {name: getattr(finding, name) for name in Project_Finding.fieldNames if name != 'id'}
+                for finding in findings
+            ]
+            if rows:
+                session.execute(Project_Finding.__table__.insert(), rows)
+            if task_short_result is not None:
+                session.query(Project_Task).filter_by(id=task_id).update({Project_Task.short_result: task_short_result})
+            session.commit()
+        except sqlalchemy.exc.IntegrityError:
+            session.rollback()
+
     def delete_findings_by_task_id(self, task_id: int):
         return self._operate_in_session(self._delete_findings_by_task_id, task_id)
 
@@ -8,6 +8,13 @@ from openai import OpenAI
 # 全局模型配置缓存
 _model_config = None
 
+# 进程内共享的 HTTP 会话：复用到 API 的 keep-alive 连接，避免每次请求都重新建立 TCP/TLS 连接
+# 连接池按各阶段的最大线程数（如 MAX_THREADS_OF_CONFIRMATION=50）留足余量
+_http_session = requests.Session()
+_http_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=64)
+_http_session.mount('https://', _http_adapter)
+_http_session.mount('http://', _http_adapter)
+
 def get_model(model_key: str) -> str:
     """直接从JSON读取模型名称"""
     global _model_config
@@ -44,7 +51,7 @@ def ask_openai_common(prompt):
                 }
             ]
         }
-        response = requests.post(f'https://{api_base}/v1/chat/completions', headers=headers, json=data)
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', headers=headers, json=data)
         try:
             response_josn = response.json()
         except Exception as e:
@@ -84,7 +91,7 @@ def ask_openai_for_json(prompt):
     # return response_josn['choices'][0]['message']['content']
     while True:
         try:
-            response = requests.post(f'https://{api_base}/v1/chat/completions', headers=headers, json=data)
+            response = _http_session.post(f'https://{api_base}/v1/chat/completions', headers=headers, json=data)
             response_json = response.json()
             if 'choices' not in response_json:
                 return ''
@@ -169,7 +176,7 @@ def detect_vulnerabilities(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -202,7 +209,7 @@ def analyze_code_assumptions(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -238,7 +245,7 @@ def ask_deepseek(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -283,7 +290,7 @@ def common_get_embedding(text: str):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/embeddings', json=data, headers=headers)
+        response = _http_session.post(f'https://{api_base}/v1/embeddings', json=data, headers=headers)
         response.raise_for_status()
         embedding_data = response.json()
         return embedding_data['data'][0]['embedding']
@@ -319,7 +326,7 @@ def perform_initial_vulnerability_validation(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -358,7 +365,7 @@ def extract_vulnerability_findings_json(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -397,7 +404,7 @@ def determine_additional_context_needed(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -438,7 +445,7 @@ def perform_comprehensive_vulnerability_analysis(prompt):
     }
 
     try:
-        response = requests.post(f'https://{api_base}/v1/chat/completions', 
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions', 
                                headers=headers, 
                                json=data)
         response.raise_for_status()
@@ -485,7 +492,7 @@ def summarize_group_vulnerability_results(group_results_prompt: str) -> str:
         
         print(f"🤖 使用模型 {get_model(model_key)} 总结同组漏洞结果...")
         
-        response = requests.post(f'https://{api_base}/v1/chat/completions',
+        response = _http_session.post(f'https://{api_base}/v1/chat/completions',
                                headers=headers,
                                json=payload)
         response.raise_for_status()
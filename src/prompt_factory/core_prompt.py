@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 class CorePrompt:
     def core_prompt_assembled():
         return """
@@ -97,6 +96,8 @@ class CorePrompt:
         """
 
     def get_project_type(self):
+        import pandas as pd
+
         checklist_path = os.getenv("CHECKLIST_PATH", "src/knowledges/checklist.xlsx")
         checklist_sheet = os.getenv("CHECKLIST_SHEET", "Sheet1")
         df = pd.read_excel(checklist_path, sheet_name=checklist_sheet)
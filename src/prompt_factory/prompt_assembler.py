@@ -4,146 +4,162 @@ from prompt_factory.periphery_prompt import PeripheryPrompt
 from prompt_factory.vul_prompt import VulPrompt
 from prompt_factory.vul_check_prompt import VulCheckPrompt
 from prompt_factory.vul_prompt_common import VulPromptCommon
+import functools
+import json
 import os
-import pandas as pd
+import string
+from typing import Any, Dict, List, Optional
 
-class PromptAssembler:
-    def assemble_prompt_common(code):
-        ret_prompt=code+"\n"\
-                    +PeripheryPrompt.role_set_solidity_common()+"\n"\
-                    +PeripheryPrompt.task_set_blockchain_common()+"\n"\
-                    +CorePrompt.core_prompt_assembled()+"\n"\
-                    +VulPrompt.vul_prompt_common_new()+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()
-
-                    
-        return ret_prompt
-    def assemble_prompt_common_fine_grained(code, prompt_index=None):
-        ret_prompt=code+"\n"\
-                    +PeripheryPrompt.role_set_solidity_common()+"\n"\
-                    +PeripheryPrompt.task_set_blockchain_common()+"\n"\
-                    +CorePrompt.core_prompt_assembled()+"\n"\
-                    +str(VulPromptCommon.vul_prompt_common_new(prompt_index))+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()
-
-                    
-        return ret_prompt
-    def assemble_prompt_pure(code):
-        ret_prompt=code+"\n"\
-                    +PeripheryPrompt.optimized_head_prompt_reasoning()+"\n"\
-                    +PeripheryPrompt.role_set_go_common()+"\n"\
-                    +PeripheryPrompt.task_set_tee_common()+"\n"\
-                    +CorePrompt.core_prompt_pure()+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()+"\n"\
-                    +PeripheryPrompt.optimized_tail_prompt_reasoning()
-
-                    
-        return ret_prompt
-    
-    @staticmethod
-    def _get_vul_prompts(business_type):
-        vul_prompts = []
-        for type in business_type:
-            if type == "chainlink":
-                vul_prompts.append(VulPrompt.vul_prompt_chainlink())
-            elif type == "dao":
-                vul_prompts.append(VulPrompt.vul_prompt_dao())
-            elif type == "inline assembly":
-                vul_prompts.append(VulPrompt.vul_prompt_inline_assembly())
-            elif type == "lending":
-                vul_prompts.append(VulPrompt.vul_prompt_lending())
-            elif type == "liquidation":
-                vul_prompts.append(VulPrompt.vul_prompt_liquidation())
-            elif type == "liquidity manager":
-                vul_prompts.append(VulPrompt.vul_prompt_liquidity_manager())
-            elif type == "signature":
-                vul_prompts.append(VulPrompt.vul_prompt_signature_replay())
-            elif type == "slippage":
-                vul_prompts.append(VulPrompt.vul_prompt_slippage())
-            elif type == "univ3":
-                vul_prompts.append(VulPrompt.vul_prompt_univ3())
-            elif type == "other":
-                vul_prompts.append(VulPrompt.vul_prompt_common_new())
-        return "\n\n".join(vul_prompts)
-    
-    @staticmethod
-    def _get_checklist_from_knowledge(business_type):
-        def get_from_xlsx(business_type):
-            checklist_path = os.getenv("CHECKLIST_PATH", "src/knowledges/checklist.xlsx")
-            checklist_sheet = os.getenv("CHECKLIST_SHEET", "Sheet1")
-            df = pd.read_excel(checklist_path, sheet_name=checklist_sheet)
-            checklist = df[df["project_type"] == business_type]["checklist"].values[0]
-            return business_type + "\n" + checklist
-        
-        return "\n\n".join([get_from_xlsx(type) for type in business_type])
+# 确认分析的 JSON 输出格式，导入时构建一次，避免在 f-string 中手写 {{ }} 转义
+_CONFIRMATION_RESULT_SCHEMA = json.dumps(
+    {"brief_of_response": "你的简要分析总结", "result": "yes/no/not_sure"},
+    ensure_ascii=False,
+)
 
-    def assemble_prompt_for_specific_project_directly_ask(code, business_type):
-        combined_vul_prompt = PromptAssembler._get_vul_prompts(business_type)
-        
-        ret_prompt = code+"\n"\
-                    +PeripheryPrompt.role_set_solidity_common()+"\n"\
-                    +CorePrompt.directly_ask_prompt()+"\n"\
-                    +combined_vul_prompt+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()
-                    
-        return ret_prompt
-        
-    def assemble_prompt_for_specific_project(code, business_type):
-        # combined_vul_prompt = PromptAssembler._get_vul_prompts(business_type)
-        combined_vul_prompt = PromptAssembler._get_checklist_from_knowledge(business_type)
-        
-        ret_prompt = code+"\n"\
-                    +PeripheryPrompt.role_set_solidity_common()+"\n"\
-                    +PeripheryPrompt.task_set_blockchain_common()+"\n"\
-                    +CorePrompt.core_prompt_assembled()+"\n"\
-                    +combined_vul_prompt+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()
-                    
-        return ret_prompt
-    def assemble_optimize_prompt(code):
-        ret_prompt=code+"\n"\
-                    +PeripheryPrompt.role_set_rust_common()+"\n"\
-                    +PeripheryPrompt.task_set_blockchain_common()+"\n"\
-                    +CorePrompt.optimize_prompt()+"\n"
-        return ret_prompt
-    def assemble_vul_check_prompt(code,vul):
-        ret_prompt=code+"\n"\
-                +str(vul)+"\n"\
-                +PeripheryPrompt.optimized_head_prompt_validating()+"\n"\
-                +VulCheckPrompt.vul_check_prompt_claude_no_overflow()+"\n"\
-                +PeripheryPrompt.optimized_tail_prompt_validating()
-        return ret_prompt
-    def assemble_vul_check_prompt_final(code,vul):
-        ret_prompt=code+"\n"\
-                +str(vul)+"\n"\
-                +PeripheryPrompt.optimized_head_prompt_validating()+"\n"\
-                +VulCheckPrompt.vul_check_prompt_claude_no_overflow_final()+"\n"\
-                +PeripheryPrompt.optimized_tail_prompt_validating()
-        return ret_prompt
+# 各 prompt 共用的静态片段：solidity 审计头部，以及 guidelines + jailbreak 结尾
+# 所有 prompt 统一为「静态指令在前、code 在末尾」，不同调用间可共享尽可能长的相同前缀，
+# 便于模型服务端的 prompt 前缀缓存命中；code 前统一使用 _CODE_SECTION_HEADER 作为分隔
+_CODE_SECTION_HEADER="\n\n# Code\n"
+# 验证类 prompt 在 code 之后还带有待验证的漏洞描述，单独成节，避免被模型当成代码的一部分
+_VUL_SECTION_HEADER="\n\n# Vulnerability\n"
+
+_COMMON_PROMPT_HEAD=PeripheryPrompt.role_set_solidity_common()+"\n"\
+            +PeripheryPrompt.task_set_blockchain_common()+"\n"\
+            +CorePrompt.core_prompt_assembled()+"\n"
+
+_GUIDELINES_PROMPT_TAIL="\n"\
+            +PeripheryPrompt.guidelines()+"\n"\
+            +PeripheryPrompt.jailbreak_prompt()
+
+# 以下 prompt 只有 code 是动态的，静态部分在导入时拼接一次，调用时只做一次拼接
+_COMMON_PROMPT=_COMMON_PROMPT_HEAD\
+            +VulPrompt.vul_prompt_common_new()\
+            +_GUIDELINES_PROMPT_TAIL\
+            +_CODE_SECTION_HEADER
+
+_PURE_PROMPT=PeripheryPrompt.optimized_head_prompt_reasoning()+"\n"\
+            +PeripheryPrompt.role_set_go_common()+"\n"\
+            +PeripheryPrompt.task_set_tee_common()+"\n"\
+            +CorePrompt.core_prompt_pure()\
+            +_GUIDELINES_PROMPT_TAIL+"\n"\
+            +PeripheryPrompt.optimized_tail_prompt_reasoning()\
+            +_CODE_SECTION_HEADER
+
+_OPTIMIZE_PROMPT=PeripheryPrompt.role_set_rust_common()+"\n"\
+            +PeripheryPrompt.task_set_blockchain_common()+"\n"\
+            +CorePrompt.optimize_prompt()\
+            +_CODE_SECTION_HEADER
+
+_CHECKLISTS_PROMPT=ChecklistsPrompt.checklists_prompt()\
+            +_CODE_SECTION_HEADER
+
+# 以下 prompt 在中间还有动态片段，静态部分预先切分为 head/tail，调用时一次 join
+_DIRECTLY_ASK_PROMPT_HEAD=PeripheryPrompt.role_set_solidity_common()+"\n"\
+            +CorePrompt.directly_ask_prompt()+"\n"
+
+_GUIDELINES_CODE_SECTION=_GUIDELINES_PROMPT_TAIL+_CODE_SECTION_HEADER
+
+_VUL_CHECK_PROMPT=PeripheryPrompt.optimized_head_prompt_validating()+"\n"\
+            +VulCheckPrompt.vul_check_prompt_claude_no_overflow()+"\n"\
+            +PeripheryPrompt.optimized_tail_prompt_validating()\
+            +_CODE_SECTION_HEADER
+
+_VUL_CHECK_FINAL_PROMPT=PeripheryPrompt.optimized_head_prompt_validating()+"\n"\
+            +VulCheckPrompt.vul_check_prompt_claude_no_overflow_final()+"\n"\
+            +PeripheryPrompt.optimized_tail_prompt_validating()\
+            +_CODE_SECTION_HEADER
+
+_CHECKLIST_SCAN_PROMPT_HEAD=_COMMON_PROMPT_HEAD+"<checklist>"+"\n"
+
+_CHECKLIST_SCAN_PROMPT_TAIL="\n"\
+            +"</checklist>"\
+            +_GUIDELINES_PROMPT_TAIL+"\n"\
+            +PeripheryPrompt.optimized_tail_prompt_reasoning()\
+            +_CODE_SECTION_HEADER
+
+def assemble_prompt_common(code: str) -> str:
+    return _COMMON_PROMPT+code
+
+def assemble_prompt_common_fine_grained(code: str, prompt_index: Optional[int] = None) -> str:
+    vul_prompt = str(VulPromptCommon.vul_prompt_common_new(prompt_index))
+    return "".join((_COMMON_PROMPT_HEAD, vul_prompt, _GUIDELINES_CODE_SECTION, code))
+
+def assemble_prompt_pure(code: str) -> str:
+    return _PURE_PROMPT+code
+
+# 业务类型 -> 代码中至少要出现的关键字之一；都不出现时该类型的漏洞 prompt 不可能命中，直接跳过
+_VUL_PROMPT_KEYWORDS = {
+    "inline assembly": ("assembly",),
+    "signature": ("ecrecover", "ECDSA", "signature", "Signature", "permit"),
+}
+
+def _filter_business_type_by_code(code: str, business_type: List[str]) -> List[str]:
+    return [
+        type for type in business_type
+        if type not in _VUL_PROMPT_KEYWORDS or any(keyword in code for keyword in _VUL_PROMPT_KEYWORDS[type])
+    ]
+
+# 业务类型 -> 对应的漏洞 prompt，导入时生成一次；未登记的业务类型直接忽略
+_VUL_PROMPTS_BY_TYPE = {
+    "chainlink": VulPrompt.vul_prompt_chainlink(),
+    "dao": VulPrompt.vul_prompt_dao(),
+    "inline assembly": VulPrompt.vul_prompt_inline_assembly(),
+    "lending": VulPrompt.vul_prompt_lending(),
+    "liquidation": VulPrompt.vul_prompt_liquidation(),
+    "liquidity manager": VulPrompt.vul_prompt_liquidity_manager(),
+    "signature": VulPrompt.vul_prompt_signature_replay(),
+    "slippage": VulPrompt.vul_prompt_slippage(),
+    "univ3": VulPrompt.vul_prompt_univ3(),
+    "other": VulPrompt.vul_prompt_common_new(),
+}
+
+def _get_vul_prompts(business_type: List[str]) -> str:
+    return "\n\n".join([_VUL_PROMPTS_BY_TYPE[type] for type in business_type if type in _VUL_PROMPTS_BY_TYPE])
+
+@functools.lru_cache(maxsize=8)
+def _load_checklist_sheet(checklist_path: str, checklist_sheet: str) -> Dict[str, str]:
+    """读取 checklist 表格一次，返回 project_type -> checklist（同一类型取第一行）"""
+    import pandas as pd
+
+    df = pd.read_excel(checklist_path, sheet_name=checklist_sheet)
+    checklists = {}
+    for project_type, checklist in zip(df["project_type"], df["checklist"]):
+        checklists.setdefault(project_type, checklist)
+    return checklists
+
+def _get_checklist_from_knowledge(business_type: List[str]) -> str:
+    checklist_path = os.getenv("CHECKLIST_PATH", "src/knowledges/checklist.xlsx")
+    checklist_sheet = os.getenv("CHECKLIST_SHEET", "Sheet1")
+    checklists = _load_checklist_sheet(checklist_path, checklist_sheet)
+    return "\n\n".join([type + "\n" + checklists[type] for type in business_type])
+
+
+def assemble_prompt_for_specific_project_directly_ask(code: str, business_type: List[str]) -> str:
+    combined_vul_prompt = _get_vul_prompts(_filter_business_type_by_code(code, business_type))
+    return "".join((_DIRECTLY_ASK_PROMPT_HEAD, combined_vul_prompt, _GUIDELINES_CODE_SECTION, code))
     
-    def assemble_checklists_prompt(code):
-        ret_prompt=code+"\n"\
-                    +ChecklistsPrompt.checklists_prompt()+"\n"
-        return ret_prompt
-    def assemble_checklists_prompt_for_scan(code,checklist_response):
-        ret_prompt = code+"\n"\
-                    +PeripheryPrompt.role_set_solidity_common()+"\n"\
-                    +PeripheryPrompt.task_set_blockchain_common()+"\n"\
-                    +CorePrompt.core_prompt_assembled()+"\n"\
-                    +"<checklist>"+"\n"\
-                    +checklist_response+"\n"\
-                    +"</checklist>"+"\n"\
-                    +PeripheryPrompt.guidelines()+"\n"\
-                    +PeripheryPrompt.jailbreak_prompt()+"\n"\
-                    +PeripheryPrompt.optimized_tail_prompt_reasoning()
-        return ret_prompt
-    def brief_of_response():
-        return """Based on the analysis response, please translate the response to JSON format. 
+def assemble_prompt_for_specific_project(code: str, business_type: List[str]) -> str:
+    # combined_vul_prompt = _get_vul_prompts(business_type)
+    combined_vul_prompt = _get_checklist_from_knowledge(business_type)
+    return "".join((_COMMON_PROMPT_HEAD, combined_vul_prompt, _GUIDELINES_CODE_SECTION, code))
+
+def assemble_optimize_prompt(code: str) -> str:
+    return _OPTIMIZE_PROMPT+code
+
+def assemble_vul_check_prompt(code: str, vul: Any) -> str:
+    return "".join((_VUL_CHECK_PROMPT, code, _VUL_SECTION_HEADER, str(vul)))
+
+def assemble_vul_check_prompt_final(code: str, vul: Any) -> str:
+    return "".join((_VUL_CHECK_FINAL_PROMPT, code, _VUL_SECTION_HEADER, str(vul)))
+
+def assemble_checklists_prompt(code: str) -> str:
+    return _CHECKLISTS_PROMPT+code
+
+def assemble_checklists_prompt_for_scan(code: str, checklist_response: str) -> str:
+    return "".join((_CHECKLIST_SCAN_PROMPT_HEAD, checklist_response, _CHECKLIST_SCAN_PROMPT_TAIL, code))
+
+def brief_of_response() -> str:
+    return """Based on the analysis response, please translate the response to JSON format. 
         The JSON format should be one of the following:
         {'brief of response':'xxx','result':'yes'} 
         {'brief of response':'xxx','result':'no'} 
@@ -152,17 +168,14 @@ class PromptAssembler:
         The 'brief of response' should contain a concise summary of the analysis,
         and the 'result' should reflect the final conclusion about the vulnerability's existence."""
 
-    @staticmethod
-    def confirmation_analysis_prompt(task_content: str, comprehensive_analysis: str) -> str:
-        """构建确认分析提示"""
-        return f"""
+_CONFIRMATION_ANALYSIS_TEMPLATE = string.Template("""
 你是一个专业的智能合约安全审计专家。请对以下综合分析结果进行确认评估。
 
 **原始任务内容:**
-{task_content}
+$task_content
 
 **综合分析结果:**
-{comprehensive_analysis}
+$comprehensive_analysis
 
 **确认要求:**
 1. 仔细审查分析结果的准确性和完整性
@@ -171,7 +184,7 @@ class PromptAssembler:
 4. 确认风险评级是否恰当
 
 **请以JSON格式回复你的确认结果:**
-{{"brief_of_response": "你的简要分析总结", "result": "yes/no/not_sure"}}
+""" + _CONFIRMATION_RESULT_SCHEMA + """
 
 其中:
 - "brief_of_response": 对分析结果的简要总结和评价
@@ -179,7 +192,31 @@ class PromptAssembler:
   - "yes": 确认存在漏洞
   - "no": 确认不存在漏洞  
   - "not_sure": 需要更多信息或分析不确定
-"""
+""")
+
+def confirmation_analysis_prompt(task_content: str, comprehensive_analysis: str) -> str:
+    """构建确认分析提示"""
+    return _CONFIRMATION_ANALYSIS_TEMPLATE.substitute(
+        task_content=task_content, comprehensive_analysis=comprehensive_analysis
+    )
+
+
+class PromptAssembler:
+    assemble_prompt_common = staticmethod(assemble_prompt_common)
+    assemble_prompt_common_fine_grained = staticmethod(assemble_prompt_common_fine_grained)
+    assemble_prompt_pure = staticmethod(assemble_prompt_pure)
+    _get_vul_prompts = staticmethod(_get_vul_prompts)
+    _get_checklist_from_knowledge = staticmethod(_get_checklist_from_knowledge)
+    assemble_prompt_for_specific_project_directly_ask = staticmethod(assemble_prompt_for_specific_project_directly_ask)
+    assemble_prompt_for_specific_project = staticmethod(assemble_prompt_for_specific_project)
+    assemble_optimize_prompt = staticmethod(assemble_optimize_prompt)
+    assemble_vul_check_prompt = staticmethod(assemble_vul_check_prompt)
+    assemble_vul_check_prompt_final = staticmethod(assemble_vul_check_prompt_final)
+    assemble_checklists_prompt = staticmethod(assemble_checklists_prompt)
+    assemble_checklists_prompt_for_scan = staticmethod(assemble_checklists_prompt_for_scan)
+    brief_of_response = staticmethod(brief_of_response)
+    confirmation_analysis_prompt = staticmethod(confirmation_analysis_prompt)
+
 
 if __name__=="__main__":
     prompt = PromptAssembler()
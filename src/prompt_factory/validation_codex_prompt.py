@@ -1,13 +1,7 @@
-class ValidationCodexPrompt:
-    @staticmethod
-    def build_validation_prompt(*, finding_json: str, rule_key: str, hint_file: str, hint_function: str) -> str:
-        """
-        Codex CLI validation 专用 prompt：
-        - 强制 agentic workflow（多步只读检索）
-        - 文档优先（README/docs/spec/NatSpec 等）
-        - 严格 JSON-only 输出，便于落库到 validation_status/validation_record
-        """
-        return f"""
+import string
+
+# validation prompt 的静态正文在导入时解析并去除首尾空白一次；JSON schema 中的花括号无需再做 {{ }} 转义
+_VALIDATION_PROMPT_TEMPLATE = string.Template("""
 你是一个专业的智能合约/区块链安全审计验证专家（Validation）。你的任务是对“候选漏洞 finding”进行复核确认。
 
 【工作区约束（必须遵守）】
@@ -31,7 +25,7 @@ class ValidationCodexPrompt:
 
 【输出要求（非常重要：只输出 JSON）】
 你必须只输出一个 JSON（不要 Markdown、不要额外解释文本），并严格匹配以下 schema：
-{{
+{
   "schema_version": "validation_codex_v1",
   "status": "pending|intended_design|false_positive|vulnerability|vuln_high_cost|vuln_low_impact|not_sure",
   "confidence": "high|medium|low",
@@ -41,26 +35,26 @@ class ValidationCodexPrompt:
   "exploit_difficulty": "easy|medium|hard|unknown",
   "reason": "用 2-5 句话说明你为何得出该结论（必须引用证据要点）",
   "evidence": [
-    {{
+    {
       "file": "相对路径（相对 workspace root）",
       "locator": "函数名/变量名/关键片段定位方式（可写行号范围或 grep 命中关键词）",
       "snippet": "<= 30 行的关键片段（可选，但强烈建议）",
       "why": "这段证据如何支持你的判断"
-    }}
+    }
   ],
   "doc_references": [
-    {{
+    {
       "file": "相对路径",
       "locator": "章节标题/关键词",
       "excerpt": "相关原文摘录（可选）",
       "why": "它如何表明 intended design 或影响评估"
-    }}
+    }
   ],
   "attack_preconditions": ["若为漏洞，列出成立前置条件；不确定可为空数组"],
   "attack_path": "若为漏洞，简述可利用路径/触发方式；非漏洞可为空字符串",
   "mitigation": "若为漏洞，给出 1-3 条修复建议；非漏洞可为空字符串",
   "unknowns": ["如果 not_sure，请列出缺失信息/无法确认的点，并说明需要看什么才能确认"]
-}}
+}
 
 【判定口径（避免误报）】
 - intended_design：行为有文档/注释/显式逻辑支持“这是预期行为”，且不存在可被滥用造成真实损害的路径。
@@ -71,12 +65,27 @@ class ValidationCodexPrompt:
 - not_sure：在受控目录内已尽力检索仍不足以确认（必须在 unknowns 中写清楚缺什么）。
 
 【输入：候选漏洞 finding_json】
-{finding_json}
+$finding_json
 
 【辅助信息（可能为空）】
-rule_key: {rule_key}
-hint_file: {hint_file}
-hint_function: {hint_function}
-""".strip()
+rule_key: $rule_key
+hint_file: $hint_file
+hint_function: $hint_function
+""".strip())
 
 
+class ValidationCodexPrompt:
+    @staticmethod
+    def build_validation_prompt(*, finding_json: str, rule_key: str, hint_file: str, hint_function: str) -> str:
+        """
+        Codex CLI validation 专用 prompt：
+        - 强制 agentic workflow（多步只读检索）
+        - 文档优先（README/docs/spec/NatSpec 等）
+        - 严格 JSON-only 输出，便于落库到 validation_status/validation_record
+        """
+        return _VALIDATION_PROMPT_TEMPLATE.substitute(
+            finding_json=finding_json,
+            rule_key=rule_key,
+            hint_file=hint_file,
+            hint_function=hint_function,
+        ).rstrip()  # 模板已预先 strip，只有末尾的 hint_function 为空时才会留下空白
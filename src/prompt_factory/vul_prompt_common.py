@@ -1,6 +1,11 @@
+import functools
+
+
 class VulPromptCommon:
     @staticmethod
-    def vul_prompt_common_new(prompt_index=None):
+    @functools.lru_cache(maxsize=1)
+    def _all_checklists():
+        """构建全部 checklist（纯静态数据，进程内只构建一次）"""
         parameter_validation_list = [
             "Checks for parameter order or type errors (e.g., 'zero share' issues, incorrect parameter sequencing)",
             "Insufficient validation of input length, indices, format, and encoding",
@@ -372,6 +377,12 @@ class VulPromptCommon:
             "erc4626_security_list_3": erc4626_security_list_3,
         }
 
+        return all_checklists
+
+    @staticmethod
+    def vul_prompt_common_new(prompt_index=None):
+        all_checklists = dict(VulPromptCommon._all_checklists())
+
         # 如果提供了 prompt_index，返回特定的检查列表
         if prompt_index is not None:
             checklist_keys = list(all_checklists.keys())
@@ -1,5 +1,8 @@
+import hashlib
 import os
 import re
+import threading
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
@@ -10,16 +13,22 @@ from prompt_factory.periphery_prompt import PeripheryPrompt
 from prompt_factory.core_prompt import CorePrompt
 from prompt_factory.assumption_validation_prompt import AssumptionValidationPrompt
 from prompt_factory.vul_reasoning_json_prompt import VulReasoningJsonPrompt
-from prompt_factory.prompt_assembler import PromptAssembler
+from prompt_factory.prompt_assembler import assemble_prompt_pure
 from openai_api.openai import analyze_code_assumptions
 from logging_config import get_logger
 import json
 from dao.entity import Project_Finding
+from dao.cache_manager import CacheManager
 from dao.finding_mgr import ProjectFindingMgr
 from codex_service import CodexClient
 from codex_runner import CodexCliError
 
 
+# Codex 输出中 ```json ... ``` 代码块，以及复用的 JSON 解码器，导入时构建一次
+_JSON_FENCE_RE = re.compile(r"```json\s*([\s\S]*?)\s*```", re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+
+
 class VulnerabilityScanner:
     """漏洞扫描器，负责智能合约代码的漏洞扫描"""
     
@@ -30,9 +39,16 @@ class VulnerabilityScanner:
         
         # 🎯 读取项目设计文档（如果启用）
         self.design_doc_content = self._load_design_document()
+        # 设计文档前缀对本项目所有任务都相同，只构建一次
+        self.design_doc_prefix = self._build_design_doc_prefix(self.design_doc_content)
         
         # 🎯 读取固定不变量列表（如果启用）
         self.fixed_invariants = self._load_fixed_invariants()
+
+        # 🎯 reasoning 结果缓存（默认关闭）：相同 prompt 重跑时直接复用上次的 codex 结果
+        self.enable_reasoning_cache = os.getenv("ENABLE_REASONING_CACHE", "False").lower() == "true"
+        self._reasoning_cache = None
+        self._reasoning_cache_lock = threading.Lock()
     
     def _load_design_document(self) -> str:
         """加载项目设计文档内容"""
@@ -69,6 +85,21 @@ class VulnerabilityScanner:
             self.logger.error(f"❌ 读取设计文档失败: {e}")
             return ""
     
+    @staticmethod
+    def _build_design_doc_prefix(design_doc_content: str) -> str:
+        """构建拼接在每个 reasoning prompt 最前面的设计文档段落，未启用设计文档时返回空串"""
+        if not design_doc_content:
+            return ""
+        return f"""# PROJECT DESIGN CONTEXT
+
+The following is the project's design document, which provides important context about the system's architecture, business logic, and security model. Use this information to better understand the developer's intentions and identify potential vulnerabilities.
+
+{design_doc_content}
+
+{"=" * 80}
+
+"""
+    
     def _load_fixed_invariants(self) -> list:
         """加载固定不变量列表"""
         # 检查是否启用固定不变量
@@ -138,12 +169,9 @@ class VulnerabilityScanner:
         max_threads = int(os.getenv("MAX_THREADS_OF_SCAN", 5))
         
         # 按 group 分组任务
-        group_dict = {}
+        group_dict = defaultdict(list)
         for task in tasks:
-            group_uuid = getattr(task, 'group', '') or 'no_group'
-            if group_uuid not in group_dict:
-                group_dict[group_uuid] = []
-            group_dict[group_uuid].append(task)
+            group_dict[getattr(task, 'group', '') or 'no_group'].append(task)
         
         # 为每个 group 定义处理函数（串行处理 group 内的任务）
         def process_group(group_tasks):
@@ -212,36 +240,40 @@ class VulnerabilityScanner:
                 rule_key
             )
             
-            # 🎯 如果启用了项目设计文档，将其添加到prompt最前面
-            if self.design_doc_content:
-                design_doc_prefix = f"""# PROJECT DESIGN CONTEXT
-
-The following is the project's design document, which provides important context about the system's architecture, business logic, and security model. Use this information to better understand the developer's intentions and identify potential vulnerabilities.
+            # 各前缀片段先收集到列表里，最后一次 join，避免每加一段都复制整个 prompt
+            # 最终顺序：同组总结（如有） -> 设计文档（如有） -> 组装好的 prompt
+            prompt_parts = []
 
-{self.design_doc_content}
-
-{"=" * 80}
-
-"""
-                assembled_prompt = design_doc_prefix + assembled_prompt
-            
-            # 🎯 如果启用了同组总结且有总结内容，将其添加到prompt前面（在设计文档之后）
+            # 🎯 如果启用了同组总结且有总结内容，将其放在最前面（设计文档之前）
             # 默认关闭：SUMMARY_IN_REASONING=False
             if summary_in_reasoning and group_summary:
                 from prompt_factory.group_summary_prompt import GroupSummaryPrompt
                 enhanced_prefix = GroupSummaryPrompt.get_enhanced_reasoning_prompt_prefix()
-                assembled_prompt = enhanced_prefix + group_summary + "\n\n" + "=" * 80 + "\n\n" + assembled_prompt
+                prompt_parts.extend((enhanced_prefix, group_summary, "\n\n", "=" * 80, "\n\n"))
+
+            # 🎯 如果启用了项目设计文档，将其添加到组装好的prompt前面
+            if self.design_doc_prefix:
+                prompt_parts.append(self.design_doc_prefix)
+
+            prompt_parts.append(assembled_prompt)
+            assembled_prompt = "".join(prompt_parts)
             
             # 🎯 reasoning阶段：改为 Codex 执行（agentic workflow + 只读检索）
             project_root = getattr(self.project_audit, "project_path", "") or ""
             if not project_root:
                 raise RuntimeError("project_audit.project_path is empty; cannot set codex --cd workspace")
 
-            codex_res = self.codex_client.exec(workspace_root=project_root, prompt=assembled_prompt)
-            if codex_res.returncode != 0:
-                raise CodexCliError(f"codex reasoning failed: {codex_res.stderr.strip()}")
+            cache_key = self._reasoning_cache_key(project_root, assembled_prompt)
+            result = self._get_cached_reasoning(task_manager, cache_key)
+            if result:
+                print(f"♻️ 任务 {task.name} 命中 reasoning 缓存，跳过 codex 调用")
+            else:
+                codex_res = self.codex_client.exec(workspace_root=project_root, prompt=assembled_prompt)
+                if codex_res.returncode != 0:
+                    raise CodexCliError(f"codex reasoning failed: {codex_res.stderr.strip()}")
 
-            result = self._extract_json_object_or_raise(codex_res.stdout)
+                result = self._extract_json_object_or_raise(codex_res.stdout)
+                self._set_cached_reasoning(task_manager, cache_key, result)
             
             # 保存结果
             if hasattr(task, 'id') and task.id:
@@ -258,6 +290,49 @@ The following is the project's design document, which provides important context
             print(f"❌ 漏洞扫描执行失败: {e}")
             return ""
 
+    @staticmethod
+    def _get_db_engine(task_manager):
+        """从 task_manager 上取 DB engine，取不到时返回 None"""
+        engine = getattr(task_manager, 'engine', None)
+        if engine is None:
+            engine = getattr(getattr(task_manager, 'Session', None), 'kw', {}).get('bind', None)
+        return engine
+
+    def _reasoning_cache_key(self, project_root: str, prompt: str) -> str:
+        """缓存键：模型 + 工作区 + prompt 的 sha256（codex 会读取工作区文件，因此工作区也参与区分）"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"codex_reasoning:{self.codex_client.settings.model}:{project_root}:{prompt_hash}"
+
+    def _get_reasoning_cache(self, task_manager) -> Optional[CacheManager]:
+        """按需创建 reasoning 缓存（复用 prompt_cache2 表），未启用或无法获取 engine 时返回 None"""
+        if not self.enable_reasoning_cache:
+            return None
+        with self._reasoning_cache_lock:
+            if self._reasoning_cache is None:
+                engine = self._get_db_engine(task_manager)
+                if engine is None:
+                    return None
+                self._reasoning_cache = CacheManager(engine)
+            return self._reasoning_cache
+
+    def _get_cached_reasoning(self, task_manager, cache_key: str) -> Optional[str]:
+        """读取 reasoning 缓存，读取失败时按未命中处理"""
+        try:
+            cache = self._get_reasoning_cache(task_manager)
+            return cache.get_cache(cache_key) if cache is not None else None
+        except Exception as e:
+            self.logger.warning(f"读取 reasoning 缓存失败: {e}")
+            return None
+
+    def _set_cached_reasoning(self, task_manager, cache_key: str, result: str) -> None:
+        """写入 reasoning 缓存，写入失败不影响本次扫描结果"""
+        try:
+            cache = self._get_reasoning_cache(task_manager)
+            if cache is not None:
+                cache.set_cache(cache_key, result)
+        except Exception as e:
+            self.logger.warning(f"写入 reasoning 缓存失败: {e}")
+
     @staticmethod
     def _extract_json_object_or_raise(text: str) -> str:
         """
@@ -269,26 +344,37 @@ The following is the project's design document, which provides important context
         if not s:
             raise ValueError("empty codex output")
 
+        # 常见情况：模型严格按要求只输出了一个 JSON 对象
+        if s.startswith("{"):
+            try:
+                if isinstance(json.loads(s), dict):
+                    return s
+            except ValueError:
+                pass
+
         # fenced json
-        m = re.search(r"```json\\s*([\\s\\S]*?)\\s*```", s, re.IGNORECASE)
+        m = _JSON_FENCE_RE.search(s)
         if m:
             candidate = m.group(1).strip()
-            obj = json.loads(candidate)
-            if not isinstance(obj, dict):
-                raise ValueError("codex fenced json is not an object")
-            return candidate
+            try:
+                obj = json.loads(candidate)
+            except ValueError:
+                obj = None
+            if isinstance(obj, dict):
+                return candidate
 
         # raw decode: find first JSON object
-        dec = json.JSONDecoder()
-        for i, ch in enumerate(s):
-            if ch != "{":
-                continue
+        # 直接在 '{' 之间跳转，并把起始位置传给 raw_decode，避免每次都切片复制剩余文本
+        dec = _JSON_DECODER
+        i = s.find("{")
+        while i != -1:
             try:
-                obj, end = dec.raw_decode(s[i:])
+                obj, end = dec.raw_decode(s, i)
                 if isinstance(obj, dict):
-                    return s[i : i + end]
+                    return s[i:end]
             except Exception:
-                continue
+                pass
+            i = s.find("{", i + 1)
 
         # fallback: first '{' last '}' slice
         l = s.find("{")
@@ -342,14 +428,21 @@ The following is the project's design document, which provides important context
             vulns = data.get("vulnerabilities", []) if isinstance(data, dict) else []
 
             # 无漏洞也视为拆分完成（避免反复重试）
-            engine = getattr(task_manager, 'engine', None) or getattr(getattr(task_manager, 'Session', None), 'kw', {}).get('bind', None)
+            engine = self._get_db_engine(task_manager)
             if engine is None:
                 self.logger.warning("无法获取 DB engine，跳过 findings 写入")
                 return
             finding_mgr = ProjectFindingMgr(task_manager.project_id, engine)
 
-            # 幂等：先删后建
-            finding_mgr.delete_findings_by_task_id(task.id)
+            # 每条 finding 的外层结构相同，只序列化一次外壳，逐条拼入单个漏洞对象
+            # （与 json.dumps({"schema_version": ..., "vulnerabilities": [vuln_obj]}) 输出一致）
+            schema_version = data.get("schema_version", "1.0") if isinstance(data, dict) else "1.0"
+            single_json_prefix = (
+                '{"schema_version": '
+                + json.dumps(schema_version, ensure_ascii=False)
+                + ', "vulnerabilities": ['
+            )
+            single_json_suffix = ']}'
 
             findings = []
             for vuln in (vulns or []):
@@ -366,17 +459,13 @@ The following is the project's design document, which provides important context
                 else:
                     vuln_obj = {"description": str(vuln)}
 
-                single_json = {
-                    "schema_version": data.get("schema_version", "1.0") if isinstance(data, dict) else "1.0",
-                    "vulnerabilities": [vuln_obj],
-                }
                 findings.append(
                     Project_Finding(
                         project_id=task_manager.project_id,
                         task_id=task.id,
                         task_uuid=getattr(task, 'uuid', ''),
                         rule_key=getattr(task, 'rule_key', ''),
-                        finding_json=json.dumps(single_json, ensure_ascii=False),
+                        finding_json=single_json_prefix + json.dumps(vuln_obj, ensure_ascii=False) + single_json_suffix,
                         task_name=getattr(task, 'name', ''),
                         task_content=getattr(task, 'content', ''),
                         task_business_flow_code=getattr(task, 'business_flow_code', ''),
@@ -393,11 +482,8 @@ The following is the project's design document, which provides important context
                     )
                 )
 
-            if findings:
-                finding_mgr.add_findings(findings, commit=True)
-
-            # 标记拆分完成
-            task_manager.update_short_result(task.id, "split_done")
+            # 幂等：先删后建（同一事务内完成，批量插入），并在同一事务内标记拆分完成
+            finding_mgr.replace_findings_by_task_id(task.id, findings, task_short_result="split_done")
         except Exception as e:
             self.logger.warning(f"拆分写入 finding 失败: {e}")
             try:
@@ -453,7 +539,7 @@ The following is the project's design document, which provides important context
         # 🎯 专门处理PURE_SCAN类型的任务
         if rule_key == "PURE_SCAN":
             # 使用pure scan的prompt组装器
-            return PromptAssembler.assemble_prompt_pure(code)
+            return assemble_prompt_pure(code)
         
         # 原有的漏洞扫描逻辑（非assumption类型）
         else:
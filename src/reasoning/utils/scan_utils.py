@@ -3,7 +3,6 @@ from typing import List, Dict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
-from prompt_factory.prompt_assembler import PromptAssembler
 from prompt_factory.vul_prompt_common import VulPromptCommon
 from openai_api.openai import detect_vulnerabilities, ask_deepseek, analyze_code_assumptions
 
@@ -12,7 +12,7 @@ from openpyxl import Workbook, load_workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 class ResProcessor:
-    def __init__(self, df, max_group_size=10, iteration_rounds=2, enable_chinese_translation=False):
+    def __init__(self, df, max_group_size=10, iteration_rounds=2, enable_chinese_translation=False, cache_manager=None):
         """
         初始化ResProcessor
         
@@ -21,12 +21,14 @@ class ResProcessor:
             max_group_size: 每组最大漏洞数量，默认为10
             iteration_rounds: 迭代轮数，默认为2
             enable_chinese_translation: 是否启用中文翻译，默认为False
+            cache_manager: 可选的CacheManager，用于缓存翻译结果，默认为None（不缓存）
         """
         self.df = df
         self.lock = Lock()
         self.max_group_size = max_group_size
         self.iteration_rounds = iteration_rounds
         self.enable_chinese_translation = enable_chinese_translation
+        self.cache_manager = cache_manager
         
         print(f"ResProcessor初始化:")
         print(f"  - 最大组大小: {self.max_group_size}")
@@ -38,9 +40,6 @@ class ResProcessor:
         print("开始漏洞归集处理...")
         print(f"总漏洞数量: {len(self.df)}")
         
-        # 添加辅助列
-        self.df['flow_code_len'] = self.df['业务流程代码'].str.len()
-        
         # 第一步：按业务流程代码分组
         initial_groups = list(self.df.groupby('业务流程代码'))
         print(f"初始分组数量: {len(initial_groups)}")
@@ -94,13 +93,9 @@ class ResProcessor:
         # 第五步：中文翻译（可选）
         final_results = self._translate_to_chinese(final_results)
         
-        # 清理辅助列并返回结果
+        # 按原始列顺序返回结果
         new_df = pd.DataFrame(final_results)
-        if 'flow_code_len' in new_df.columns:
-            new_df = new_df.drop('flow_code_len', axis=1)
-            
-        original_columns = [col for col in self.df.columns if col != 'flow_code_len']
-        new_df = new_df[original_columns]
+        new_df = new_df[list(self.df.columns)]
         
         return new_df
 
@@ -662,9 +657,11 @@ class ResProcessor:
         print(f"\n=== 开始中文翻译 ===")
         print(f"需要翻译 {len(final_results)} 个漏洞结果...")
         
-        translated_results = []
+        # 预先按原顺序占位，完成一个填一个
+        translated_results = [None] * len(final_results)
+        max_threads = int(os.getenv("MAX_THREADS_OF_TRANSLATION", 10))
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
             future_to_index = {
                 executor.submit(self._translate_single_result, i, result): i 
                 for i, result in enumerate(final_results)
@@ -674,22 +671,13 @@ class ResProcessor:
                 for future in concurrent.futures.as_completed(future_to_index):
                     try:
                         index = future_to_index[future]
-                        translated_result = future.result()
-                        
-                        # 保持原有顺序
-                        while len(translated_results) <= index:
-                            translated_results.append(None)
-                        translated_results[index] = translated_result
+                        translated_results[index] = future.result()
                         
                         print(f"  漏洞 {index+1} 翻译完成")
                     except Exception as e:
                         index = future_to_index[future]
                         original_result = final_results[index]
                         print(f"  漏洞 {index+1} 翻译失败: {str(e)}")
-                        
-                        # 保持原有顺序
-                        while len(translated_results) <= index:
-                            translated_results.append(None)
                         translated_results[index] = original_result
                     pbar.update(1)
         
@@ -712,6 +700,14 @@ class ResProcessor:
 漏洞描述：
 {original_result}"""
 
+        # 相同的漏洞描述（跨分组、跨多次运行）直接复用已缓存的翻译，不再请求 LLM
+        cached_description = self._get_cached_translation(translate_prompt)
+        if cached_description:
+            print(f"    漏洞 {index+1}: 命中翻译缓存")
+            translated_result = result.copy()
+            translated_result['漏洞结果'] = cached_description
+            return translated_result
+
         max_retries = 3  # 最大重试次数
         retry_count = 0
         
@@ -738,6 +734,8 @@ class ResProcessor:
                         print(f"    漏洞 {index+1}: ❌ 重试 {max_retries} 次后仍然失败，保留原结果")
                         return result
                 
+                self._set_cached_translation(translate_prompt, cleaned_description)
+                
                 # 创建新的结果副本
                 translated_result = result.copy()
                 translated_result['漏洞结果'] = cleaned_description
@@ -759,6 +757,25 @@ class ResProcessor:
         # 如果所有重试都失败，返回原结果
         return result
 
+    def _get_cached_translation(self, translate_prompt):
+        """读取翻译缓存，未配置缓存或读取失败时返回None"""
+        if self.cache_manager is None:
+            return None
+        try:
+            return self.cache_manager.get_cache(translate_prompt)
+        except Exception as e:
+            print(f"    读取翻译缓存失败: {str(e)}")
+            return None
+
+    def _set_cached_translation(self, translate_prompt, translated_description):
+        """写入翻译缓存，写入失败不影响翻译结果"""
+        if self.cache_manager is None:
+            return
+        try:
+            self.cache_manager.set_cache(translate_prompt, translated_description)
+        except Exception as e:
+            print(f"    写入翻译缓存失败: {str(e)}")
+
     @staticmethod
     def perform_post_reasoning_deduplication(project_id, db_engine, logger):
         """在reasoning完成后，validation开始前进行去重处理"""
@@ -888,7 +905,7 @@ class ResProcessor:
     @staticmethod
     def generate_excel(output_path, project_id, db_engine):
         """生成Excel报告"""
-        from dao import ProjectFindingMgr
+        from dao import CacheManager, ProjectFindingMgr
         
         finding_mgr = ProjectFindingMgr(project_id, db_engine)
         entities = finding_mgr.query_findings_by_project_id(project_id)
@@ -940,9 +957,21 @@ class ResProcessor:
             
         df = pd.DataFrame(data)
         
+        # 翻译结果缓存（默认关闭）：开启后缓存到 prompt_cache2 表，重复生成报告时相同的漏洞描述不再重复翻译
+        translation_cache = None
+        if os.getenv("ENABLE_TRANSLATION_CACHE", "False").lower() == "true":
+            try:
+                translation_cache = CacheManager(db_engine)
+            except Exception as e:
+                print(f"初始化翻译缓存失败，本次不使用缓存: {e}")
+                translation_cache = None
+        
         try:
             # 对df进行漏洞归集处理
-            res_processor = ResProcessor(df, max_group_size=5, iteration_rounds=15, enable_chinese_translation=True)
+            res_processor = ResProcessor(
+                df, max_group_size=5, iteration_rounds=15, enable_chinese_translation=True,
+                cache_manager=translation_cache,
+            )
             processed_df = res_processor.process()
             
             # 确保所有必需的列都存在
@@ -1,3 +1,4 @@
+import json
 import os
 
 from sqlalchemy import create_engine
@@ -5,6 +6,11 @@ from sqlalchemy import create_engine
 from codex_service import CodexClient
 from validating.finding_checker import FindingVulnerabilityChecker
 
+# 数据集目录只与本文件位置有关，导入时计算一次
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DATASET_BASE = os.path.abspath(os.path.join(_REPO_ROOT, "src", "dataset", "agent-v1-c4"))
+_DATASETS_JSON = os.path.join(_DATASET_BASE, "datasets.json")
+
 
 class _MinimalProjectAudit:
     def __init__(self, project_id: str, project_path: str):
@@ -21,13 +27,10 @@ def main() -> int:
     project_id = os.getenv("TEST_PROJECT_ID", "dca5555")
 
     # 主扫描目录（严格对齐主流程）：project_id -> datasets.json[path] -> dataset_base/path
-    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    dataset_base = os.path.abspath(os.path.join(repo_root, "src", "dataset", "agent-v1-c4"))
-    datasets_json = os.path.join(dataset_base, "datasets.json")
-    with open(datasets_json, "r", encoding="utf-8") as f:
-        dj = __import__("json").load(f)
+    with open(_DATASETS_JSON, "r", encoding="utf-8") as f:
+        dj = json.load(f)
     rel = (dj.get(project_id) or {}).get("path") or ""
-    project_root = os.path.abspath(os.path.join(dataset_base, rel))
+    project_root = os.path.abspath(os.path.join(_DATASET_BASE, rel))
 
     audit = _MinimalProjectAudit(project_id=project_id, project_path=project_root)
 
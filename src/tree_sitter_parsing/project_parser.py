@@ -38,6 +38,10 @@ TREE_SITTER_AVAILABLE = True
 print("✅ Tree-sitter解析器已加载，支持五种语言")
 
 
+# 支持五种语言的文件后缀：Solidity, Rust, C++, Move, Go（str.endswith 可直接接收元组）
+_VALID_EXTENSIONS = ('.sol', '.rs', '.move', '.c', '.cpp', '.cxx', '.cc', '.C', '.h', '.hpp', '.hxx', '.go')
+
+
 class LanguageType:
     SOLIDITY = 'solidity'
     RUST = 'rust'
@@ -55,8 +59,7 @@ class TreeSitterProjectFilter(object):
     def filter_file(self, path, filename):
         """过滤文件"""
         # 检查文件后缀 - 支持五种语言：Solidity, Rust, C++, Move, Go
-        valid_extensions = ('.sol', '.rs', '.move', '.c', '.cpp', '.cxx', '.cc', '.C', '.h', '.hpp', '.hxx', '.go')
-        if not any(filename.endswith(ext) for ext in valid_extensions) or filename.endswith('.t.sol'):
+        if not filename.endswith(_VALID_EXTENSIONS) or filename.endswith('.t.sol'):
             return True
         
         return False
@@ -696,14 +699,16 @@ def parse_project(project_path, project_filter=None):
     # 遍历项目目录
     for dirpath, dirs, files in os.walk(project_path):
         dirs[:] = [d for d in dirs if d not in ignore_folders]
+        # 相对目录每个目录只算一次，文件的相对路径直接拼接，不再逐个文件调用 relpath
+        relative_dir = os.path.relpath(dirpath, project_path)
         for file in files:
-            file_path = os.path.join(dirpath, file)
-            relative_path = os.path.relpath(file_path, project_path)
+            relative_path = file if relative_dir == os.curdir else os.path.join(relative_dir, file)
             
             # 应用文件过滤（仅用于函数解析）
             to_scan = not project_filter.filter_file(dirpath, file)
             
             if to_scan:
+                file_path = os.path.join(dirpath, file)
                 print(f"✅ parsing file: {relative_path}")
                 files_parsed.append(relative_path)
                 
@@ -8,7 +8,6 @@ import tiktoken
 from dao.entity import Project_Task
 
 from ..utils.check_utils import CheckUtils
-from prompt_factory.prompt_assembler import PromptAssembler
 from openai_api.openai import analyze_code_assumptions, extract_structured_json
 
 
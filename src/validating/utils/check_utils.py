@@ -1,6 +1,6 @@
 import json
 from typing import List, Dict, Tuple
-from prompt_factory.prompt_assembler import PromptAssembler
+from prompt_factory.prompt_assembler import brief_of_response
 from openai_api.openai import extract_structured_json
 
 
@@ -53,7 +53,7 @@ class CheckUtils:
         Returns:
             str: Extracted result status
         """
-        prompt_translate_to_json = PromptAssembler.brief_of_response()
+        prompt_translate_to_json = brief_of_response()
         
         # Use extract_structured_json to get JSON response
         round_json_response = str(extract_structured_json(round_response + "\n" + prompt_translate_to_json))